@@ -0,0 +1,62 @@
+"""
+Модуль настройки логирования приложения.
+Записи логов передаются через очередь в отдельный поток,
+чтобы запись в stderr не блокировала event loop.
+"""
+
+from logging.handlers import QueueHandler, QueueListener
+import logging
+import os
+import queue
+
+# Формат записей лога
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+
+# Обработчик корневого логгера и поток записи (None, пока логирование не настроено)
+_queue_handler: QueueHandler | None = None
+_listener: QueueListener | None = None
+
+
+def setup_logging():
+    """
+    Добавляет корневому логгеру запись через очередь (существующие обработчики сохраняются).
+    Вывод в stderr выполняет QueueListener в фоновом потоке.
+    SQL запросы логируются, только если задана переменная окружения DB_ECHO.
+    Повторный вызов без shutdown_logging() ничего не делает.
+    """
+    global _queue_handler, _listener
+    if _listener is not None:
+        return
+
+    log_queue = queue.Queue(-1)  # неограниченная очередь записей
+
+    stream_handler = logging.StreamHandler()  # пишет в stderr
+    stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    _queue_handler = QueueHandler(log_queue)
+    root = logging.getLogger()
+    root.addHandler(_queue_handler)
+    root.setLevel(os.getenv("LOG_LEVEL", "INFO"))
+
+    # Логирование SQL запросов для отладки (аналог echo=True у движка)
+    if os.getenv("DB_ECHO"):
+        logging.getLogger("sqlalchemy.engine").setLevel(logging.INFO)
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging():
+    """
+    Снимает обработчик очереди с корневого логгера и останавливает поток записи
+    (оставшиеся в очереди записи будут выведены).
+    """
+    global _queue_handler, _listener
+    if _listener is None:
+        return
+
+    logging.getLogger().removeHandler(_queue_handler)
+    _listener.stop()
+    _queue_handler = None
+    _listener = None
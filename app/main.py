@@ -3,21 +3,28 @@
 Содержит эндпоинты API и настройки приложения.
 """
 
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
+from async_lru import alru_cache
 from .database import async_session, init_db
-from .services.parser import WikipediaParser
+from .logging_config import setup_logging, shutdown_logging
+from .services.parser import WikipediaParser, close_cache
 from .services.llm import MistralAI
 from .services.database import DatabaseService
-from .schemas import Article, Summary
+from .schemas import Article, Summary, SummaryCreate
 import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
 
 # Создание экземпляра FastAPI приложения
 app = FastAPI(
     title="Wikipedia Parser API",
     description="API для парсинга статей Википедии и генерации summary",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse  # сериализация ответов через orjson
 )
 
 # Настройка CORS (Cross-Origin Resource Sharing)
@@ -30,14 +37,35 @@ app.add_middleware(
 )
 
 
+# Общий клиент Mistral AI на все запросы (переиспользует HTTP-соединения)
+llm = MistralAI()
+
+# URL статей, для которых summary еще генерируется в фоне
+pending_summaries: set[str] = set()
+
+
 @app.on_event("startup")
 async def startup():
     """
     Функция, выполняемая при старте приложения.
-    Инициализирует базу данных.
+    Настраивает логирование через очередь и фоновый поток (не блокирует event loop)
+    и инициализирует базу данных.
     """
+    setup_logging()
     await init_db()
-    print("Application started")
+    logger.info("Application started")
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """
+    Функция, выполняемая при остановке приложения.
+    Закрывает HTTP-клиент Mistral AI, соединения с Redis
+    и останавливает поток логирования.
+    """
+    await llm.close()
+    await close_cache()
+    shutdown_logging()
 
 
 async def get_db() -> AsyncSession:
@@ -49,12 +77,35 @@ async def get_db() -> AsyncSession:
         yield session
 
 
+async def generate_and_store_summary(article_id: int, url: str, content: str):
+    """
+    Фоновая задача: генерирует summary статьи с помощью Mistral AI и сохраняет его в БД.
+    Открывает собственную сессию, т.к. сессия запроса к этому моменту уже закрыта.
+    """
+    try:
+        summary_content = await llm.generate_summary(content)
+        if summary_content:
+            async with async_session() as session:
+                await DatabaseService(session).create_summary(SummaryCreate(
+                    content=summary_content,
+                    article_id=article_id
+                ))
+            fetch_summary.cache_invalidate(url)  # сбрасываем кэш summary для этого URL
+    finally:
+        pending_summaries.discard(url)
+
+
 @app.post("/parse/", response_model=Article)
-async def parse_wiki_article(url: str, db: AsyncSession = Depends(get_db)):
+async def parse_wiki_article(
+    url: str,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db)
+):
     """
     Эндпоинт для парсинга статьи Википедии.
-    Принимает URL статьи, парсит ее и вложенные статьи (до 5 уровня вложенности),
-    сохраняет в БД и генерирует summary для основной статьи.
+    Принимает URL статьи, парсит ее и вложенные статьи (до 5 уровня вложенности)
+    и сохраняет в БД. Summary для основной статьи генерируется в фоне
+    после отправки ответа.
     """
     db_service = DatabaseService(db)
 
@@ -75,64 +126,62 @@ async def parse_wiki_article(url: str, db: AsyncSession = Depends(get_db)):
             detail="Failed to parse article from Wikipedia"
         )
 
-    async def save_article(article: dict, parent_id: int = None) -> Article:
-        """
-        Вложенная функция для рекурсивного сохранения статей в БД.
-        """
-        article_create = ArticleCreate(
-            url=article["url"],
-            title=article["title"],
-            content=article["content"],
-            level=article["level"]
-        )
-        # Сохраняем статью в БД
-        db_article = await db_service.create_article(article_create, parent_id)
-
-        # Рекурсивно сохраняем дочерние статьи
-        for child in article["children"]:
-            await save_article(child, db_article.id)
-
-        return db_article
+    # Сохраняем основную статью и все вложенные одной транзакцией
+    main_article = await db_service.create_article_tree(article_data)
+    content = main_article.content  # распаковываем текст один раз
 
-    # Сохраняем основную статью и все вложенные
-    main_article = await save_article(article_data)
+    # Генерируем summary для основной статьи с помощью Mistral AI в фоне
+    pending_summaries.add(url)
+    background_tasks.add_task(generate_and_store_summary, main_article.id, url, content)
 
-    # Генерируем summary для основной статьи с помощью Mistral AI
-    llm = MistralAI()
-    summary_content = await llm.generate_summary(main_article.content)
+    # Строка уже загружена из RETURNING - собираем ответ по полям схемы Article
+    # без повторной валидации (model_construct) и сериализуем через orjson
+    fields = {
+        name: getattr(main_article, name)
+        for name in Article.model_fields
+        if name != "content"  # текст уже распакован выше
+    }
+    return ORJSONResponse(content=Article.model_construct(content=content, **fields).model_dump())
 
-    if summary_content:
-        # Сохраняем summary в БД
-        await db_service.create_summary(SummaryCreate(
-            content=summary_content,
-            article_id=main_article.id
-        ))
 
-    return main_article
+@alru_cache(maxsize=4096)
+async def fetch_summary(url: str) -> Summary:
+    """
+    Загружает summary статьи по URL с кэшированием в памяти процесса.
+    Сгенерированное summary не меняется, поэтому результат кэшируется по URL.
+    Ошибки (HTTPException) не кэшируются - повторный запрос снова обратится к БД.
+    Открывает собственную короткую сессию, т.к. результат переживает запрос.
+    """
+    async with async_session() as session:
+        db_service = DatabaseService(session)
+
+        # Ищем summary статьи по URL одним запросом
+        summary = await db_service.get_summary_by_article_url(url)
+        if not summary:
+            if url in pending_summaries:
+                raise HTTPException(
+                    status_code=202,
+                    detail="Summary is being generated"
+                )
+            # Уточняем причину ошибки: нет статьи или нет summary
+            if not await db_service.get_article_by_url(url):
+                raise HTTPException(
+                    status_code=404,
+                    detail="Article not found in database"
+                )
+            raise HTTPException(
+                status_code=404,
+                detail="Summary not found for this article"
+            )
+
+        return Summary.model_validate(summary)
 
 
 @app.get("/summary/", response_model=Summary)
-async def get_article_summary(url: str, db: AsyncSession = Depends(get_db)):
+async def get_article_summary(url: str):
     """
     Эндпоинт для получения summary статьи по ее URL.
-    Возвращает ранее сгенерированное summary или ошибку 404.
+    Возвращает ранее сгенерированное summary, 202 если оно еще генерируется,
+    или ошибку 404.
     """
-    db_service = DatabaseService(db)
-
-    # Ищем статью по URL
-    article = await db_service.get_article_by_url(url)
-    if not article:
-        raise HTTPException(
-            status_code=404,
-            detail="Article not found in database"
-        )
-
-    # Ищем summary для статьи
-    summary = await db_service.get_summary_for_article(article.id)
-    if not summary:
-        raise HTTPException(
-            status_code=404,
-            detail="Summary not found for this article"
-        )
-
-    return summary
\ No newline at end of file
+    return await fetch_summary(url)
@@ -3,13 +3,38 @@
 Определяет структуру таблиц и отношения между ними.
 """
 
-from sqlalchemy import Column, Integer, String, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, LargeBinary, ForeignKey
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
+import threading
+import zstandard
 
 # Базовый класс для всех моделей SQLAlchemy
 Base = declarative_base()
 
+# Уровень сжатия zstd для текста статей
+ZSTD_LEVEL = 6
+
+# Контексты zstd не потокобезопасны, а сжатие выполняется в пуле потоков (asyncio.to_thread),
+# поэтому храним их отдельно для каждого потока
+_zstd = threading.local()
+
+
+def compress_content(text: str) -> bytes:
+    """Сжимает текст статьи zstd для хранения в БД"""
+    compressor = getattr(_zstd, "compressor", None)
+    if compressor is None:
+        compressor = _zstd.compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+    return compressor.compress(text.encode())
+
+
+def decompress_content(data: bytes) -> str:
+    """Распаковывает текст статьи, сжатый compress_content"""
+    decompressor = getattr(_zstd, "decompressor", None)
+    if decompressor is None:
+        decompressor = _zstd.decompressor = zstandard.ZstdDecompressor()
+    return decompressor.decompress(data).decode()
+
 
 class Article(Base):
     """
@@ -21,8 +46,8 @@ class Article(Base):
     id = Column(Integer, primary_key=True, index=True)
     url = Column(String, unique=True, index=True)  # URL статьи (уникальный)
     title = Column(String)  # заголовок статьи
-    content = Column(Text)  # полный текст статьи
-    parent_id = Column(Integer, ForeignKey("articles.id"))  # ссылка на родительскую статью
+    content_z = Column(LargeBinary)  # полный текст статьи, сжатый zstd
+    parent_id = Column(Integer, ForeignKey("articles.id"), index=True)  # ссылка на родительскую статью
     level = Column(Integer)  # уровень вложенности (0 для корневой статьи)
 
     # Связь один-ко-многим: статья может иметь много дочерних статей
@@ -34,6 +59,15 @@ class Article(Base):
     # Связь один-к-одному: у статьи может быть одно краткое содержание
     summaries = relationship("Summary", back_populates="article", uselist=False)
 
+    @property
+    def content(self) -> str | None:
+        """Полный текст статьи (распаковывается из content_z при обращении)"""
+        return decompress_content(self.content_z) if self.content_z is not None else None
+
+    @content.setter
+    def content(self, text: str | None):
+        self.content_z = compress_content(text) if text is not None else None
+
 
 class Summary(Base):
     """
@@ -44,7 +78,7 @@ class Summary(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     content = Column(Text)  # текст summary
-    article_id = Column(Integer, ForeignKey("articles.id"))  # ссылка на статью
+    article_id = Column(Integer, ForeignKey("articles.id"), index=True)  # ссылка на статью
 
     # Связь многие-к-одному: summary принадлежит одной статье
     article = relationship("Article", back_populates="summaries")
\ No newline at end of file
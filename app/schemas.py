@@ -3,11 +3,14 @@
 Используется для проверки входных/выходных данных API.
 """
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 
 class ArticleBase(BaseModel):
     """Базовая схема статьи (общие поля)"""
+    # неизменяемые экземпляры без повторной валидации при присваивании
+    model_config = ConfigDict(frozen=True, validate_assignment=False)
+
     url: str  # URL статьи
     title: str  # заголовок
     content: str  # содержимое
@@ -24,13 +27,14 @@ class Article(ArticleBase):
     id: int  # ID статьи в БД
     parent_id: int | None  # ID родительской статьи
 
-    class Config:
-        # разрешает использовать ORM модели (не только dict)
-        from_attributes = True
+    # разрешает использовать ORM модели (не только dict)
+    model_config = ConfigDict(from_attributes=True)
 
 
 class SummaryBase(BaseModel):
     """Базовая схема краткого содержания"""
+    model_config = ConfigDict(frozen=True, validate_assignment=False)
+
     content: str  # текст summary
 
 
@@ -44,5 +48,4 @@ class Summary(SummaryBase):
     id: int  # ID summary в БД
     article_id: int  # ID статьи
 
-    class Config:
-        from_attributes = True
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
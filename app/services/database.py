@@ -5,8 +5,39 @@
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from ..models import Article, Summary
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from pydantic import TypeAdapter
+from typing_extensions import TypedDict  # typing.TypedDict не поддерживается pydantic на Python < 3.12
+from ..models import Article, Summary, compress_content
 from ..schemas import ArticleCreate, SummaryCreate
+import asyncio
+
+
+class ArticleRow(TypedDict):
+    """Строка таблицы articles до сжатия текста"""
+    url: str
+    title: str
+    content: str
+    level: int
+    parent_id: int | None
+
+
+def _compress_rows(rows: list[ArticleRow]) -> list[dict]:
+    """Строит строки для INSERT, заменяя текст content на сжатый zstd content_z"""
+    return [
+        {
+            "url": row["url"],
+            "title": row["title"],
+            "content_z": compress_content(row["content"]),
+            "level": row["level"],
+            "parent_id": row["parent_id"]
+        }
+        for row in rows
+    ]
+
+
+# Пакетная валидация строк статей сразу в словари (один вызов pydantic-core на уровень дерева)
+_article_rows_adapter = TypeAdapter(list[ArticleRow])
 
 
 class DatabaseService:
@@ -26,26 +57,81 @@ class DatabaseService:
         :return: объект Article или None если не найдено
         """
         result = await self.session.execute(select(Article).where(Article.url == url))
-        return result.scalars().first()  # возвращаем первый результат или None
+        return result.scalar_one_or_none()  # URL уникален: одна статья или None
+
+    async def _insert_articles(self, rows: list[ArticleRow]) -> dict[str, Article]:
+        """
+        Вставляет статьи одним запросом INSERT ... ON CONFLICT (url) DO NOTHING.
+        Статьи, уже существующие в БД, дочитываются одним SELECT по URL.
+        :param rows: список строк статей (текст сжимается перед вставкой)
+        :return: словарь URL -> объект Article (новый или существующий)
+        """
+        # Сжатие (CPU-bound) выполняется в пуле потоков, чтобы не блокировать event loop
+        insert_rows = await asyncio.to_thread(_compress_rows, rows)
+        stmt = (
+            pg_insert(Article)
+            .values(insert_rows)
+            .on_conflict_do_nothing(index_elements=["url"])
+            .returning(Article)
+        )
+        result = await self.session.scalars(stmt)
+        articles = {article.url: article for article in result}
+
+        # RETURNING не возвращает строки, попавшие в конфликт
+        missing = [row["url"] for row in rows if row["url"] not in articles]
+        if missing:
+            result = await self.session.scalars(select(Article).where(Article.url.in_(missing)))
+            articles.update((article.url, article) for article in result)
+        return articles
 
     async def create_article(self, article_data: ArticleCreate, parent_id: int = None) -> Article:
         """
         Создает новую статью в БД.
+        Если статья с таким URL уже есть, возвращает существующую.
         :param article_data: данные статьи из схемы ArticleCreate
         :param parent_id: ID родительской статьи (опционально)
         :return: созданный объект Article
         """
-        article = Article(
-            url=article_data.url,
-            title=article_data.title,
-            content=article_data.content,
-            level=article_data.level,
-            parent_id=parent_id
-        )
-        self.session.add(article)  # добавляем статью в сессию
+        row = article_data.model_dump()
+        if parent_id is not None:
+            row["parent_id"] = parent_id
+        articles = await self._insert_articles([row])
         await self.session.commit()  # сохраняем изменения
-        await self.session.refresh(article)  # обновляем объект из БД
-        return article
+        return articles[article_data.url]
+
+    async def create_article_tree(self, root_data: dict) -> Article:
+        """
+        Сохраняет дерево статей одной транзакцией.
+        Статьи вставляются по уровням: один INSERT на уровень, parent_id
+        берется из ID статей предыдущего уровня. Статьи, уже сохраненные
+        ранее, не дублируются - к ним привязываются новые дочерние статьи.
+        :param root_data: словарь корневой статьи с вложенными статьями в "children"
+        :return: объект Article корневой статьи
+        """
+        root = None
+        level_nodes = [(root_data, None)]  # пары (данные статьи, ID родителя)
+        while level_nodes:
+            articles = await self._insert_articles(_article_rows_adapter.validate_python([
+                {
+                    "url": article["url"],
+                    "title": article["title"],
+                    "content": article["content"],
+                    "level": article["level"],
+                    "parent_id": parent_id
+                }
+                for article, parent_id in level_nodes
+            ], strict=True))
+            if root is None:
+                root = articles[root_data["url"]]
+
+            next_level = []
+            for article, _ in level_nodes:
+                article_id = articles[article["url"]].id
+                next_level.extend((child, article_id) for child in article["children"])
+            level_nodes = next_level
+
+        await self.session.commit()  # один коммит на все дерево
+        return root
 
     async def create_summary(self, summary_data: SummaryCreate) -> Summary:
         """
@@ -58,8 +144,8 @@ class DatabaseService:
             article_id=summary_data.article_id
         )
         self.session.add(summary)
-        await self.session.commit()
-        await self.session.refresh(summary)
+        await self.session.flush()  # INSERT ... RETURNING заполняет summary.id без отдельного SELECT
+        await self.session.commit()  # expire_on_commit=False - атрибуты остаются загруженными
         return summary
 
     async def get_summary_for_article(self, article_id: int) -> Summary | None:
@@ -68,5 +154,21 @@ class DatabaseService:
         :param article_id: ID статьи
         :return: объект Summary или None если не найдено
         """
-        result = await self.session.execute(select(Summary).where(Summary.article_id == article_id))
-        return result.scalars().first()
\ No newline at end of file
+        result = await self.session.execute(
+            select(Summary).where(Summary.article_id == article_id).limit(1)
+        )
+        return result.scalar_one_or_none()
+
+    async def get_summary_by_article_url(self, url: str) -> Summary | None:
+        """
+        Находит summary по URL статьи одним запросом (JOIN со статьями).
+        :param url: URL статьи
+        :return: объект Summary или None если статья или summary не найдены
+        """
+        result = await self.session.execute(
+            select(Summary)
+            .join(Article, Summary.article_id == Article.id)
+            .where(Article.url == url)
+            .limit(1)
+        )
+        return result.scalar_one_or_none()
\ No newline at end of file
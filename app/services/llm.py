@@ -4,9 +4,13 @@
 """
 
 import httpx
+import logging
+import orjson
 import os
 from typing import Optional
 
+logger = logging.getLogger(__name__)
+
 # API ключ Mistral AI
 MISTRAL_API_KEY = os.getenv("MISTRAL_API_KEY", "7gLe94Fi7MTy98eKg1pZkTHknigu3TMP")
 
@@ -21,6 +25,21 @@ class MistralAI:
         """Инициализация клиента Mistral AI"""
         self.api_key = MISTRAL_API_KEY
         self.base_url = "https://api.mistral.ai/v1"  # базовый URL API
+        # Долгоживущий клиент: keep-alive и HTTP/2 вместо нового TLS-рукопожатия на каждый запрос
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            http2=True,
+            headers={
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json"
+            },
+            timeout=httpx.Timeout(30.0, connect=5.0),  # таймауты запроса в секундах
+            limits=httpx.Limits(max_keepalive_connections=20)
+        )
+
+    async def close(self):
+        """Закрывает HTTP-клиент (вызывается при остановке приложения)"""
+        await self._client.aclose()
 
     async def generate_summary(self, text: str) -> Optional[str]:
         """
@@ -36,28 +55,23 @@ class MistralAI:
         )
 
         try:
-            async with httpx.AsyncClient() as client:
-                # Отправляем POST запрос к API Mistral
-                response = await client.post(
-                    f"{self.base_url}/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": "mistral-tiny",  # используем самую легкую модель
-                        "messages": [{"role": "user", "content": prompt}],
-                        "temperature": 0.7  # параметр "творчества" (от 0 до 1)
-                    },
-                    timeout=30.0  # таймаут запроса в секундах
-                )
-
-                if response.status_code == 200:
-                    # Извлекаем сгенерированный текст из ответа
-                    return response.json()["choices"][0]["message"]["content"]
-                else:
-                    print(f"Mistral API error: {response.status_code} - {response.text}")
-                    return None
+            # Отправляем POST запрос к API Mistral
+            response = await self._client.post(
+                "/chat/completions",
+                content=orjson.dumps({
+                    "model": "mistral-tiny",  # используем самую легкую модель
+                    "messages": [{"role": "user", "content": prompt}],
+                    "temperature": 0.7  # параметр "творчества" (от 0 до 1)
+                })
+            )
+
+            if response.status_code == 200:
+                # Извлекаем сгенерированный текст из ответа
+                data = orjson.loads(response.content)
+                return data["choices"][0]["message"]["content"]
+            else:
+                logger.warning("Mistral API error: %s - %s", response.status_code, response.text)
+                return None
         except Exception as e:
-            print(f"Error calling Mistral AI: {e}")
+            logger.warning("Error calling Mistral AI: %s", e)
             return None
\ No newline at end of file
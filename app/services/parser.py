@@ -1,18 +1,125 @@
 """
 Модуль для парсинга статей Википедии.
-Использует BeautifulSoup для разбора HTML и aiohttp для асинхронных HTTP запросов.
+Использует потоковый парсер lxml для разбора HTML и aiohttp для асинхронных HTTP запросов.
 """
 
-from bs4 import BeautifulSoup
+from lxml import etree
 import aiohttp
-from urllib.parse import urljoin
+import orjson
+import redis.asyncio as redis
 from typing import Optional
+from collections import deque
+import asyncio
+import logging
+import os
 import re
 
+logger = logging.getLogger(__name__)
+
+# Сноски вида [1], [2] и т.д. (компилируем один раз на модуль)
+_FOOTNOTE_RE = re.compile(r'\[\d+\]')
+
+# Ссылка на статью Википедии (без служебных страниц и параметров запроса)
+_WIKI_HREF_RE = re.compile(r'^/wiki/([^:#?]+)(?:#.*)?$')
+
+# Количество дочерних статей, разбираемых для каждой статьи (для ограничения нагрузки)
+_MAX_CHILDREN = 3
+
+# Ограничение потоков разбора HTML, общее для всех парсеров (и всех запросов)
+_PARSE_SEM = asyncio.Semaphore(os.cpu_count() or 4)
+
+# Теги, текст которых не является текстом статьи
+_SKIP_TAGS = frozenset(("style", "script"))
+
+# Размер блока при потоковом чтении тела ответа
+_CHUNK_SIZE = 65536
+
+# Кэш разобранных страниц в Redis (общий для всех запросов и процессов).
+# Если REDIS_URL не задан, кэш отключен
+REDIS_URL = os.getenv("REDIS_URL")
+_CACHE_TTL = 86400  # время жизни записи в секундах (24 часа)
+_redis = redis.from_url(REDIS_URL) if REDIS_URL else None
+
+
+async def close_cache():
+    """Закрывает соединения с Redis (вызывается при остановке приложения)"""
+    if _redis is not None:
+        await _redis.aclose()
+
+
+class WikiArticleTarget:
+    """
+    Цель (target) для потокового lxml-парсера.
+    Собирает заголовок статьи, текст параграфов и ссылки на другие статьи
+    из основного контента, не строя DOM-дерево страницы.
+    """
+
+    def __init__(self, max_links: int = _MAX_CHILDREN):
+        """Инициализация пустого состояния разбора"""
+        self.title_parts: list[str] = []  # текст заголовка h1#firstHeading
+        self.paragraphs: list[str] = []  # непустые параграфы основного контента
+        self.links: dict[str, None] = {}  # имена статей из ссылок (dict сохраняет порядок)
+        self.max_links = max_links  # после стольких уникальных ссылок остальные не проверяются
+        self.done = False  # основной контент полностью прочитан
+        self.content_seen = False  # на странице найден div#mw-content-text
+        self._in_title = False  # находимся внутри заголовка
+        self._content_depth = 0  # глубина вложенности div внутри div#mw-content-text
+        self._paragraph: Optional[list[str]] = None  # текст текущего параграфа
+        self._skip_depth = 0  # глубина вложенности style/script (их текст не собирается)
+
+    def start(self, tag: str, attrib: dict):
+        """Обработка открывающего тега"""
+        if tag in _SKIP_TAGS:
+            self._skip_depth += 1
+        elif self._content_depth:
+            if tag == "div":
+                self._content_depth += 1
+            elif tag == "p":
+                self._paragraph = []
+            elif tag == "a" and len(self.links) < self.max_links:
+                # Фильтруем только ссылки на другие статьи Википедии, исключая служебные страницы
+                match = _WIKI_HREF_RE.match(attrib.get("href", ""))
+                if match:
+                    self.links[match.group(1)] = None
+        elif tag == "div" and attrib.get("id") == "mw-content-text":
+            self._content_depth = 1
+            self.content_seen = True
+        elif tag == "h1" and attrib.get("id") == "firstHeading":
+            self._in_title = True
+
+    def end(self, tag: str):
+        """Обработка закрывающего тега"""
+        if tag in _SKIP_TAGS:
+            self._skip_depth = max(self._skip_depth - 1, 0)
+        elif self._content_depth:
+            if tag == "div":
+                self._content_depth -= 1
+                self.done = not self._content_depth
+            elif tag == "p" and self._paragraph is not None:
+                text = "".join(self._paragraph)
+                if text.strip():
+                    self.paragraphs.append(text)
+                self._paragraph = None
+        elif tag == "h1":
+            self._in_title = False
+
+    def data(self, data: str):
+        """Обработка текстового содержимого"""
+        if self._skip_depth:
+            return  # CSS (TemplateStyles) и скрипты не входят в текст статьи
+        if self._in_title:
+            self.title_parts.append(data)
+        elif self._paragraph is not None:
+            self._paragraph.append(data)
+
+    def close(self):
+        """Завершение разбора (результат читается из атрибутов)"""
+        return None
+
 
 class WikipediaParser:
     """
-    Парсер статей Википедии с рекурсивным обходом связанных статей.
+    Парсер статей Википедии с обходом связанных статей.
     Поддерживает ограничение по уровню вложенности.
     """
 
@@ -20,80 +127,157 @@ class WikipediaParser:
         """Инициализация парсера"""
         self.base_url = base_url  # базовый URL Википедии
         self.visited_urls = set()  # множество посещенных URL (чтобы избежать циклов)
+        self._session: Optional[aiohttp.ClientSession] = None  # общая HTTP-сессия на весь обход
+        self._sem = asyncio.Semaphore(8)  # ограничение числа одновременных запросов к Википедии
 
-    async def fetch_page(self, url: str) -> Optional[str]:
+    async def fetch_article(self, url: str) -> Optional[WikiArticleTarget]:
         """
-        Асинхронно загружает HTML страницы по URL.
-        Возвращает текст страницы или None при ошибке.
+        Асинхронно загружает страницу по URL и разбирает HTML по мере получения.
+        После закрытия блока основного контента тело дочитывается без разбора,
+        чтобы соединение вернулось в пул aiohttp.
+        Разбор HTML (CPU-bound) выполняется в пуле потоков, чтобы не блокировать event loop.
+        Возвращает заполненный WikiArticleTarget или None при ошибке.
         """
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url) as response:
-                    if response.status == 200:
-                        return await response.text()
-                    return None
+            async with self._sem:
+                async with self._session.get(url) as response:
+                    if response.status != 200:
+                        return None
+
+                    target = WikiArticleTarget()
+                    parser = etree.HTMLParser(target=target, encoding=response.charset or "utf-8")
+                    async for chunk in response.content.iter_chunked(_CHUNK_SIZE):
+                        if not target.done:
+                            await self._run_parser(parser.feed, chunk)
+                    await self._run_parser(parser.close)
+                    return target
         except Exception as e:
-            print(f"Error fetching {url}: {e}")
+            logger.warning("Error fetching %s: %s", url, e)
             return None
 
+    async def _run_parser(self, func, *args):
+        """Выполняет шаг разбора HTML в отдельном потоке с ограничением их числа."""
+        async with _PARSE_SEM:
+            return await asyncio.to_thread(func, *args)
+
     async def parse_article(self, url: str, level: int = 0, max_level: int = 5) -> Optional[dict]:
         """
-        Рекурсивно парсит статью и связанные статьи.
+        Парсит статью и связанные статьи до заданного уровня вложенности.
+        Открывает одну HTTP-сессию, которая переиспользуется всеми запросами
+        обхода (keep-alive и пул соединений aiohttp). Экземпляр парсера
+        рассчитан на один обход (/parse/ создает новый парсер на каждый запрос).
         :param url: URL статьи для парсинга
         :param level: текущий уровень вложенности (0 для корневой статьи)
         :param max_level: максимальный уровень вложенности
         :return: словарь с данными статьи и вложенных статей или None
         """
-        # Проверяем, не превышен ли максимальный уровень или уже посещали URL
-        if level > max_level or url in self.visited_urls:
-            return None
+        connector = aiohttp.TCPConnector(limit=32, ttl_dns_cache=300)
+        async with aiohttp.ClientSession(
+            connector=connector,
+            headers={"Accept-Encoding": "gzip"}
+        ) as session:
+            self._session = session
+            try:
+                return await self._parse_article(url, level, max_level)
+            finally:
+                self._session = None
 
-        self.visited_urls.add(url)  # отмечаем URL как посещенный
-        html = await self.fetch_page(url)
-        if not html:
+    async def _cache_get(self, url: str) -> Optional[dict]:
+        """Возвращает разобранную страницу из Redis или None."""
+        if _redis is None:
+            return None
+        try:
+            blob = await _redis.get(f"wiki:{url}")
+        except Exception as e:
+            logger.warning("Error reading cache for %s: %s", url, e)
             return None
+        return orjson.loads(blob) if blob else None
 
-        soup = BeautifulSoup(html, 'html.parser')  # создаем объект BeautifulSoup
+    async def _cache_set(self, url: str, page_data: dict):
+        """Сохраняет разобранную страницу в Redis на _CACHE_TTL секунд."""
+        if _redis is None:
+            return
+        try:
+            await _redis.setex(f"wiki:{url}", _CACHE_TTL, orjson.dumps(page_data))
+        except Exception as e:
+            logger.warning("Error writing cache for %s: %s", url, e)
 
-        # Извлекаем заголовок статьи (h1 с id="firstHeading")
-        title = soup.find("h1", {"id": "firstHeading"}).text
+    async def _parse_page(self, url: str, level: int) -> Optional[tuple[dict, list[str]]]:
+        """
+        Загружает и разбирает одну статью (без обхода вложенных).
+        :param url: URL статьи для парсинга
+        :param level: уровень вложенности статьи
+        :return: пара (словарь с данными статьи, URL связанных статей) или None
+        """
+        # Проверяем, не посещали ли уже URL. Проверка и отметка выполняются
+        # до первого await, поэтому конкурентные загрузки не дублируют страницу
+        if url in self.visited_urls:
+            return None
 
-        # Находим основной контент статьи (div с id="mw-content-text")
-        content_div = soup.find("div", {"id": "mw-content-text"})
+        self.visited_urls.add(url)  # отмечаем URL как посещенный
+
+        # Сначала ищем страницу в кэше, чтобы не загружать и не разбирать ее повторно
+        page_data = await self._cache_get(url)
+        if page_data is None:
+            page = await self.fetch_article(url)
+            # Страница без заголовка или основного контента - не статья (не кэшируем и не сохраняем)
+            if not page or not page.title_parts or not page.content_seen:
+                return None
 
-        # Извлекаем все параграфы и объединяем их текст
-        paragraphs = content_div.find_all("p")
-        content = "\n".join([p.text for p in paragraphs if p.text.strip()])
+            # Объединяем текст параграфов основного контента (div с id="mw-content-text")
+            # и удаляем сноски вида [1], [2] и т.д. из текста
+            content = _FOOTNOTE_RE.sub('', "\n".join(page.paragraphs))
 
-        # Удаляем сноски вида [1], [2] и т.д. из текста
-        content = re.sub(r'\[\d+\]', '', content)
+            page_data = {
+                "title": "".join(page.title_parts),  # заголовок (h1 с id="firstHeading")
+                "content": content,
+                # Ссылки на другие статьи Википедии из основного контента
+                # (префикс фиксирован, поэтому URL собирается без urljoin)
+                "links": [f"{self.base_url}/wiki/{name}" for name in page.links]
+            }
+            await self._cache_set(url, page_data)
 
         # Формируем структуру данных статьи
         article_data = {
             "url": url,
-            "title": title,
-            "content": content,
+            "title": page_data["title"],
+            "content": page_data["content"],
             "level": level,
             "children": []  # список для вложенных статей
         }
+        return article_data, page_data["links"]
+
+    async def _parse_article(self, url: str, level: int, max_level: int) -> Optional[dict]:
+        """
+        Обходит статью и связанные статьи в ширину (BFS) без рекурсии.
+        Статьи одного уровня загружаются параллельно.
+        :param url: URL корневой статьи обхода
+        :param level: уровень вложенности корневой статьи
+        :param max_level: максимальный уровень вложенности
+        :return: словарь с данными статьи и вложенных статей или None
+        """
+        if level > max_level:
+            return None
+
+        root = None
+        queue = deque([(url, level, None)])  # (URL, уровень, словарь родительской статьи)
+        while queue:
+            batch = [queue.popleft() for _ in range(len(queue))]
+            results = await asyncio.gather(*[
+                self._parse_page(article_url, article_level)
+                for article_url, article_level, _ in batch
+            ])
+
+            for (_, article_level, parent), result in zip(batch, results):
+                if result is None:
+                    continue
+                article_data, wiki_links = result
+                if parent is None:
+                    root = article_data
+                else:
+                    parent["children"].append(article_data)
 
-        # Если не достигли максимального уровня, ищем и парсим связанные статьи
-        if level < max_level:
-            # Находим все ссылки в основном контенте
-            links = content_div.find_all("a", href=True)
-            wiki_links = set()  # используем set для уникальных URL
-
-            for link in links:
-                href = link["href"]
-                # Фильтруем только ссылки на другие статьи Википедии
-                if href.startswith("/wiki/") and ":" not in href:  # исключаем служебные страницы
-                    full_url = urljoin(self.base_url, href)
-                    wiki_links.add(full_url)
-
-            # Парсим первые 3 дочерние статьи (для ограничения нагрузки)
-            for child_url in list(wiki_links)[:3]:
-                child_article = await self.parse_article(child_url, level + 1, max_level)
-                if child_article:
-                    article_data["children"].append(child_article)
-
-        return article_data
\ No newline at end of file
+                # Если не достигли максимального уровня, ставим в очередь связанные статьи
+                if article_level < max_level:
+                    queue.extend((child_url, article_level + 1, article_data) for child_url in wiki_links)
+        return root